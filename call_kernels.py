@@ -0,0 +1,29 @@
+# Numba kernels for the call log generator. They live outside app.py so Streamlit reruns
+# reuse the compiled dispatcher from sys.modules instead of rebuilding it on every run.
+import numpy as np
+import numba as nb
+
+# Status codes used by the generator: 0=Answered, 1=Busy, 2=Not Answered, 3=Others
+STATUS_STRINGS = np.array(["Answered", "Busy", "Not Answered", "Others"], dtype=object)
+
+@nb.njit(cache=True)
+def gen_day(base_codes, interval, jitter_max, business_seconds, rng):
+    n = len(base_codes)
+
+    # Shuffle this phone's copy of the day's statuses
+    codes = base_codes.copy()
+    rng.shuffle(codes)
+
+    offsets = np.empty(n, dtype=np.float64)
+    status_codes = np.empty(n, dtype=np.int8)
+    cursor = 0.0
+    count = 0
+    for i in range(n):
+        cursor += interval + rng.uniform(-jitter_max, jitter_max)
+        if cursor >= business_seconds:
+            break
+        offsets[count] = cursor
+        status_codes[count] = codes[i]
+        count += 1
+
+    return offsets[:count], status_codes[:count]